@@ -0,0 +1,49 @@
+"""
+In-memory submission rate limiting (token bucket per workspace)
+
+Buckets live in the API process, so with several API replicas the effective
+per-workspace rate is `submissions_per_minute` per replica.
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket holding up to `capacity` tokens, refilled at `rate` tokens/second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token; returns 0 on success, otherwise seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1 - self.tokens) / self.rate
+
+
+class SubmissionRateLimiter:
+    """Per-workspace submission buckets, allowing bursts of up to one minute's quota"""
+
+    def __init__(self):
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, workspace_id: int, per_minute: int) -> Optional[float]:
+        """None if the submission is admitted, otherwise a Retry-After hint in seconds"""
+        with self._lock:
+            bucket = self._buckets.get(workspace_id)
+            if bucket is None or bucket.capacity != per_minute:
+                bucket = TokenBucket(capacity=per_minute, rate=per_minute / 60.0)
+                self._buckets[workspace_id] = bucket
+            retry_after = bucket.try_acquire()
+        return retry_after or None
@@ -2,7 +2,7 @@
 Pydantic schemas for API request/response models
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 
 
@@ -53,12 +53,21 @@ class JobCreate(BaseModel):
     is_active: bool = True
 
 
+class JobUpdate(BaseModel):
+    """Partial update; a changed definition creates a new job version"""
+    name: Optional[str] = Field(None, min_length=1, max_length=255)
+    definition: Optional[Dict[str, Any]] = None
+    description: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
 class JobResponse(BaseModel):
     id: int
     workspace_id: int
     name: str
     job_type: str
     definition: Dict[str, Any]
+    current_version_id: Optional[int]
     description: Optional[str]
     is_active: bool
     created_at: datetime
@@ -76,6 +85,7 @@ class RunCreate(BaseModel):
 class RunResponse(BaseModel):
     id: int
     job_id: int
+    job_version_id: Optional[int]
     status: str
     parameters: Optional[Dict[str, Any]]
     started_at: Optional[datetime]
@@ -91,3 +101,78 @@ class RunResponse(BaseModel):
 
 
 
+
+
+class WorkspaceQuotaUpdate(BaseModel):
+    """Quota overrides; null resets a limit to the platform default"""
+    max_queued_runs: Optional[int] = Field(None, ge=0)
+    max_running_runs: Optional[int] = Field(None, ge=0)
+    submissions_per_minute: Optional[int] = Field(None, ge=0)
+
+
+class WorkspaceQuotaResponse(BaseModel):
+    workspace_id: int
+    max_queued_runs: int
+    max_running_runs: int
+    submissions_per_minute: int
+    queued_runs: int
+    running_runs: int
+
+
+class RunDurationStats(BaseModel):
+    mean_seconds: Optional[float]
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    p99_seconds: Optional[float]
+    bucket_bounds_seconds: List[float]
+    histogram: List[int]
+
+
+class RunStatsHour(BaseModel):
+    bucket_start: datetime
+    counts_by_status: Dict[str, int]
+
+
+class RunStatsResponse(BaseModel):
+    scope: str
+    scope_id: int
+    window_start: datetime
+    window_end: datetime
+    total_runs: int
+    counts_by_status: Dict[str, int]
+    success_rate: Optional[float]
+    duration: RunDurationStats
+    hourly: List[RunStatsHour]
+
+
+class JobVersionResponse(BaseModel):
+    id: int
+    job_id: int
+    version: int
+    content_hash: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JobVersionDetailResponse(JobVersionResponse):
+    job_type: str
+    definition: Dict[str, Any]
+
+
+class JobVersionChange(BaseModel):
+    path: str
+    change: str  # "added", "removed" or "changed"
+    old: Optional[Any]
+    new: Optional[Any]
+
+
+class JobVersionDiffResponse(BaseModel):
+    job_id: int
+    from_version: int
+    to_version: int
+    from_hash: str
+    to_hash: str
+    identical: bool
+    changes: List[JobVersionChange]
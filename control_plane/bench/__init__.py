@@ -0,0 +1 @@
+# Benchmark and load-testing harness for the control plane
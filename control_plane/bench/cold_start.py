@@ -0,0 +1,124 @@
+"""
+Cold-start probe for embedded mode
+
+Starts `python -m embedded` against a fresh SQLite database, polls /health and
+reports process-start-to-healthy time (median of --runs), plus a `-X importtime`
+breakdown of the heaviest top-level imports on the startup path. Exits non-zero
+when the median exceeds --budget.
+
+Run from the control_plane directory:
+
+    python -m bench.cold_start --runs 5 --budget 1.0
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CONTROL_PLANE_DIR = Path(__file__).resolve().parents[1]
+
+# Target from the embedded-mode request: healthy within one second of process start
+DEFAULT_BUDGET_SECONDS = 1.0
+
+# Top-level imports reported in the breakdown
+IMPORT_MODULES = ("fastapi", "sqlalchemy", "uvicorn", "db.models", "api.main", "worker.worker")
+
+
+def healthy(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.05) as sock:
+            sock.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            return b" 200 " in sock.recv(64)
+    except OSError:
+        return False
+
+
+def start_to_healthy(port: int, timeout: float) -> Optional[float]:
+    """Seconds from spawning `python -m embedded` until /health returns 200"""
+    with tempfile.TemporaryDirectory(prefix="sadeem-cold-start-") as tmp:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "embedded", "--port", str(port),
+             "--database-url", f"sqlite:///{tmp}/embedded.db"],
+            cwd=str(CONTROL_PLANE_DIR),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while time.perf_counter() - started < timeout:
+                if healthy(port):
+                    return time.perf_counter() - started
+                if process.poll() is not None:
+                    return None
+                time.sleep(0.005)
+            return None
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def import_breakdown() -> Dict[str, float]:
+    """Cumulative import time (ms) of IMPORT_MODULES when loading the embedded startup path"""
+    with tempfile.TemporaryDirectory(prefix="sadeem-cold-start-") as tmp:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import api.main, worker.worker, uvicorn"],
+            cwd=str(CONTROL_PLANE_DIR),
+            env={**os.environ, "SADEEM_EMBEDDED": "1", "DATABASE_URL": f"sqlite:///{tmp}/embedded.db"},
+            capture_output=True,
+            text=True,
+        )
+    breakdown: Dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if name in IMPORT_MODULES and name not in breakdown:
+            breakdown[name] = int(cumulative) / 1000.0
+    return breakdown
+
+
+def interpreter_startup() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - started
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure embedded mode start-to-healthy time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Fail when the median start-to-healthy time exceeds this (seconds)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    samples = [start_to_healthy(args.port, args.timeout) for _ in range(args.runs)]
+    measured = [s for s in samples if s is not None]
+    median = statistics.median(measured) if measured else None
+    results: Dict[str, Any] = {
+        "start_to_healthy_ms": {
+            "median": median * 1000.0 if median is not None else None,
+            "samples": [s * 1000.0 if s is not None else None for s in samples],
+        },
+        "interpreter_startup_ms": interpreter_startup() * 1000.0,
+        "import_ms": import_breakdown(),
+        "budget_ms": args.budget * 1000.0,
+        "within_budget": median is not None and median <= args.budget,
+    }
+    print(json.dumps(results, indent=2))
+    return 0 if results["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
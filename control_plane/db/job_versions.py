@@ -0,0 +1,107 @@
+"""
+Content-addressed job versions
+
+A job's definition is hashed (sha256 over canonical JSON of job_type + definition).
+Each distinct content is stored once in job_definitions; job_versions records the
+per-job history and runs pin the version they execute. Comparing two versions
+starts with their hashes, so identical definitions never need to be loaded.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from db.models import Job, JobDefinition, JobVersion
+
+# Marker for a key missing on one side of a diff
+_MISSING = object()
+
+
+def definition_hash(job_type: str, definition: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        {"job_type": job_type, "definition": definition},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _get_or_create_definition(db: Session, content_hash: str, job: Job) -> JobDefinition:
+    job_definition = db.get(JobDefinition, content_hash)
+    if job_definition is not None:
+        return job_definition
+    try:
+        with db.begin_nested():
+            job_definition = JobDefinition(
+                content_hash=content_hash, job_type=job.job_type, definition=job.definition
+            )
+            db.add(job_definition)
+        return job_definition
+    except IntegrityError:
+        # Same content stored concurrently by another request
+        return db.get(JobDefinition, content_hash)
+
+
+def ensure_current_version(db: Session, job: Job) -> JobVersion:
+    """Make the job's current definition its latest version, creating one if the content changed
+
+    The caller should hold a lock on the job row when the job already exists, so
+    concurrent updates cannot allocate the same version number.
+    """
+    content_hash = definition_hash(job.job_type, job.definition)
+    current = job.current_version
+    if current is not None and current.content_hash == content_hash:
+        return current
+
+    _get_or_create_definition(db, content_hash, job)
+    version = JobVersion(
+        job=job,
+        version=(current.version + 1) if current is not None else 1,
+        content_hash=content_hash,
+    )
+    db.add(version)
+    db.flush()
+    job.current_version = version
+    return version
+
+
+def get_version(db: Session, job_id: int, version: int) -> Optional[JobVersion]:
+    return (
+        db.query(JobVersion)
+        .filter(JobVersion.job_id == job_id, JobVersion.version == version)
+        .first()
+    )
+
+
+def _diff(old: Any, new: Any, path: str, changes: List[Dict[str, Any]]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new), key=str):
+            _diff(old.get(key, _MISSING), new.get(key, _MISSING), f"{path}/{key}", changes)
+        return
+    if old == new:
+        return
+    if old is _MISSING:
+        changes.append({"path": path or "/", "change": "added", "old": None, "new": new})
+    elif new is _MISSING:
+        changes.append({"path": path or "/", "change": "removed", "old": old, "new": None})
+    else:
+        changes.append({"path": path or "/", "change": "changed", "old": old, "new": new})
+
+
+def diff_versions(from_version: JobVersion, to_version: JobVersion) -> List[Dict[str, Any]]:
+    """Changes between two versions as JSON-pointer-style paths; empty when the hashes match"""
+    if from_version.content_hash == to_version.content_hash:
+        return []
+    old = from_version.job_definition
+    new = to_version.job_definition
+    changes: List[Dict[str, Any]] = []
+    _diff(
+        {"job_type": old.job_type, "definition": old.definition},
+        {"job_type": new.job_type, "definition": new.definition},
+        "",
+        changes,
+    )
+    return changes
@@ -0,0 +1,49 @@
+"""Workspace quotas and admission counters
+
+Revision ID: 002_workspace_quotas
+Revises: 001_initial
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_workspace_quotas'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workspace_quotas',
+        sa.Column('workspace_id', sa.Integer(), nullable=False),
+        sa.Column('max_queued_runs', sa.Integer(), nullable=True),
+        sa.Column('max_running_runs', sa.Integer(), nullable=True),
+        sa.Column('submissions_per_minute', sa.Integer(), nullable=True),
+        sa.Column('queued_runs', sa.Integer(), nullable=False),
+        sa.Column('running_runs', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+        sa.PrimaryKeyConstraint('workspace_id')
+    )
+
+    # Seed counters from existing runs; from here on they are maintained incrementally
+    op.execute(
+        """
+        INSERT INTO workspace_quotas (workspace_id, queued_runs, running_runs, updated_at)
+        SELECT w.id,
+               COUNT(r.id) FILTER (WHERE r.status = 'queued'),
+               COUNT(r.id) FILTER (WHERE r.status = 'running'),
+               now()
+        FROM workspaces w
+        LEFT JOIN jobs j ON j.workspace_id = w.id
+        LEFT JOIN runs r ON r.job_id = j.id
+        GROUP BY w.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workspace_quotas')
@@ -0,0 +1,68 @@
+"""Hourly run-statistics rollups
+
+Revision ID: 003_run_stats_hourly
+Revises: 002_workspace_quotas
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from db.rollups import DURATION_BUCKETS, bucket_index, hour_start
+
+# revision identifiers, used by Alembic.
+revision = '003_run_stats_hourly'
+down_revision = '002_workspace_quotas'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    run_stats_hourly = op.create_table(
+        'run_stats_hourly',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scope', sa.String(length=20), nullable=False),
+        sa.Column('scope_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('run_count', sa.Integer(), nullable=False),
+        sa.Column('duration_seconds_total', sa.Float(), nullable=False),
+        sa.Column('duration_histogram', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scope', 'scope_id', 'bucket_start', 'status', name='uq_run_stats_hourly_key')
+    )
+    op.create_index(op.f('ix_run_stats_hourly_id'), 'run_stats_hourly', ['id'], unique=False)
+    op.create_index('ix_run_stats_hourly_scope', 'run_stats_hourly', ['scope', 'scope_id', 'bucket_start'], unique=False)
+
+    # Backfill from existing terminal runs; afterwards the worker maintains rollups incrementally
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT r.job_id, j.workspace_id, r.status, r.started_at, r.completed_at "
+        "FROM runs r JOIN jobs j ON j.id = r.job_id "
+        "WHERE r.status IN ('succeeded', 'failed', 'cancelled') AND r.completed_at IS NOT NULL"
+    ))
+    rollups = {}
+    for job_id, workspace_id, status, started_at, completed_at in rows:
+        for key in (('job', job_id), ('workspace', workspace_id)):
+            entry = rollups.setdefault(
+                key + (hour_start(completed_at), status),
+                {'run_count': 0, 'duration_seconds_total': 0.0,
+                 'duration_histogram': [0] * (len(DURATION_BUCKETS) + 1)},
+            )
+            entry['run_count'] += 1
+            if started_at is not None:
+                duration = max(0.0, (completed_at - started_at).total_seconds())
+                entry['duration_seconds_total'] += duration
+                entry['duration_histogram'][bucket_index(duration)] += 1
+    if rollups:
+        op.bulk_insert(run_stats_hourly, [
+            {'scope': scope, 'scope_id': scope_id, 'bucket_start': bucket_start, 'status': status, **entry}
+            for (scope, scope_id, bucket_start, status), entry in rollups.items()
+        ])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_run_stats_hourly_scope', table_name='run_stats_hourly')
+    op.drop_index(op.f('ix_run_stats_hourly_id'), table_name='run_stats_hourly')
+    op.drop_table('run_stats_hourly')
@@ -0,0 +1,99 @@
+"""Content-addressed job versions
+
+Revision ID: 004_job_versions
+Revises: 003_run_stats_hourly
+Create Date: 2026-10-19
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from db.job_versions import definition_hash
+
+# revision identifiers, used by Alembic.
+revision = '004_job_versions'
+down_revision = '003_run_stats_hourly'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    job_definitions = op.create_table(
+        'job_definitions',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('job_type', sa.String(length=50), nullable=False),
+        sa.Column('definition', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+
+    op.create_table(
+        'job_versions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+        sa.ForeignKeyConstraint(['content_hash'], ['job_definitions.content_hash'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id', 'version', name='uq_job_versions_job_id_version')
+    )
+    op.create_index(op.f('ix_job_versions_id'), 'job_versions', ['id'], unique=False)
+    op.create_index(op.f('ix_job_versions_job_id'), 'job_versions', ['job_id'], unique=False)
+    op.create_index(op.f('ix_job_versions_content_hash'), 'job_versions', ['content_hash'], unique=False)
+
+    op.add_column('jobs', sa.Column('current_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_jobs_current_version_id', 'jobs', 'job_versions', ['current_version_id'], ['id'])
+
+    op.add_column('runs', sa.Column('job_version_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_runs_job_version_id', 'runs', 'job_versions', ['job_version_id'], ['id'])
+    op.create_index(op.f('ix_runs_job_version_id'), 'runs', ['job_version_id'], unique=False)
+
+    # Backfill: every existing job gets version 1 from its current definition. Definitions
+    # could not be edited through the API before this revision, so existing runs are pinned
+    # to that version as well.
+    bind = op.get_bind()
+    jobs = bind.execute(sa.text("SELECT id, job_type, definition FROM jobs")).all()
+    seen = set()
+    for job_id, job_type, definition in jobs:
+        content_hash = definition_hash(job_type, definition)
+        if content_hash not in seen:
+            seen.add(content_hash)
+            op.bulk_insert(job_definitions, [{
+                'content_hash': content_hash,
+                'job_type': job_type,
+                'definition': definition,
+                'created_at': datetime.utcnow(),
+            }])
+        version_id = bind.execute(
+            sa.text(
+                "INSERT INTO job_versions (job_id, version, content_hash, created_at) "
+                "VALUES (:job_id, 1, :content_hash, now()) RETURNING id"
+            ),
+            {'job_id': job_id, 'content_hash': content_hash},
+        ).scalar()
+        bind.execute(
+            sa.text("UPDATE jobs SET current_version_id = :version_id WHERE id = :job_id"),
+            {'version_id': version_id, 'job_id': job_id},
+        )
+        bind.execute(
+            sa.text("UPDATE runs SET job_version_id = :version_id WHERE job_id = :job_id"),
+            {'version_id': version_id, 'job_id': job_id},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_runs_job_version_id'), table_name='runs')
+    op.drop_constraint('fk_runs_job_version_id', 'runs', type_='foreignkey')
+    op.drop_column('runs', 'job_version_id')
+    op.drop_constraint('fk_jobs_current_version_id', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'current_version_id')
+    op.drop_index(op.f('ix_job_versions_content_hash'), table_name='job_versions')
+    op.drop_index(op.f('ix_job_versions_job_id'), table_name='job_versions')
+    op.drop_index(op.f('ix_job_versions_id'), table_name='job_versions')
+    op.drop_table('job_versions')
+    op.drop_table('job_definitions')
@@ -0,0 +1,43 @@
+"""Run transition outbox
+
+Revision ID: 005_run_transition_outbox
+Revises: 004_job_versions
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_run_transition_outbox'
+down_revision = '004_job_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'run_transition_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=False),
+        sa.Column('workspace_id', sa.Integer(), nullable=False),
+        sa.Column('from_status', sa.String(length=50), nullable=True),
+        sa.Column('to_status', sa.String(length=50), nullable=False),
+        sa.Column('payload', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('published_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['run_id'], ['runs.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_run_transition_outbox_id'), 'run_transition_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_run_transition_outbox_run_id'), 'run_transition_outbox', ['run_id'], unique=False)
+    op.create_index(op.f('ix_run_transition_outbox_published_at'), 'run_transition_outbox', ['published_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_run_transition_outbox_published_at'), table_name='run_transition_outbox')
+    op.drop_index(op.f('ix_run_transition_outbox_run_id'), table_name='run_transition_outbox')
+    op.drop_index(op.f('ix_run_transition_outbox_id'), table_name='run_transition_outbox')
+    op.drop_table('run_transition_outbox')
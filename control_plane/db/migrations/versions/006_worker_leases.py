@@ -0,0 +1,36 @@
+"""Worker leases: runs.claimed_by and worker heartbeats
+
+Revision ID: 006_worker_leases
+Revises: 005_run_transition_outbox
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_worker_leases'
+down_revision = '005_run_transition_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Runs already running have no owner; workers reclaim them once they have been
+    # running longer than WORKER_LEASE_TIMEOUT (see worker/leases.py)
+    op.add_column('runs', sa.Column('claimed_by', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_runs_claimed_by'), 'runs', ['claimed_by'], unique=False)
+
+    op.create_table(
+        'worker_heartbeats',
+        sa.Column('worker_id', sa.String(length=255), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('worker_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('worker_heartbeats')
+    op.drop_index(op.f('ix_runs_claimed_by'), table_name='runs')
+    op.drop_column('runs', 'claimed_by')
@@ -0,0 +1,25 @@
+"""Row versions on jobs and runs for list ETags
+
+Revision ID: 007_row_versions
+Revises: 006_worker_leases
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_row_versions'
+down_revision = '006_worker_leases'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('row_version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('runs', sa.Column('row_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('runs', 'row_version')
+    op.drop_column('jobs', 'row_version')
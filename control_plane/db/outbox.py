@@ -0,0 +1,39 @@
+"""
+Transactional outbox for run state transitions
+
+Every run status change (submission included) adds one run_transition_outbox row
+in the same transaction as the change itself, so downstream consumers see exactly
+the transitions that committed, in commit order per run. A relay publishes
+unpublished rows (`published_at IS NULL`, oldest first; `FOR UPDATE SKIP LOCKED`
+when several relays share the table) and stamps `published_at`.
+"""
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from db.models import Run, RunTransitionOutbox
+
+
+def _json_safe(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def record_transition(
+    db: Session,
+    run: Run,
+    workspace_id: int,
+    from_status: Optional[str],
+    payload: Optional[Dict[str, Any]] = None,
+) -> RunTransitionOutbox:
+    """Queue the outbox record for `run` having moved from `from_status` to its current status"""
+    event = RunTransitionOutbox(
+        run_id=run.id,
+        job_id=run.job_id,
+        workspace_id=workspace_id,
+        from_status=from_status,
+        to_status=run.status,
+        payload={key: _json_safe(value) for key, value in (payload or {}).items()} or None,
+    )
+    db.add(event)
+    return event
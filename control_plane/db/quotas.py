@@ -0,0 +1,94 @@
+"""
+Workspace run quotas backed by counters on the workspace_quotas table
+
+Admission never counts `runs` rows: the API increments `queued_runs` when a run
+is submitted and the worker moves it to `running_runs` when the run starts and
+releases it when the run finishes. The API side is a single conditional UPDATE;
+the worker applies many transitions per commit, so it locks the affected rows
+(`lock_quotas`, in workspace id order) and adjusts them in place. Either way
+limits hold across API replicas and worker processes.
+"""
+import os
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from db.models import WorkspaceQuota
+
+# Platform defaults, used when a workspace has no override
+DEFAULT_MAX_QUEUED_RUNS = int(os.getenv("QUOTA_MAX_QUEUED_RUNS", "1000"))
+DEFAULT_MAX_RUNNING_RUNS = int(os.getenv("QUOTA_MAX_RUNNING_RUNS", "20"))
+DEFAULT_SUBMISSIONS_PER_MINUTE = int(os.getenv("QUOTA_SUBMISSIONS_PER_MINUTE", "600"))
+
+
+def effective_limit(override: Optional[int], default: int) -> int:
+    return default if override is None else override
+
+
+def get_or_create_quota(db: Session, workspace_id: int) -> WorkspaceQuota:
+    """Fetch the quota row for a workspace, creating it for workspaces that predate quotas"""
+    quota = db.get(WorkspaceQuota, workspace_id)
+    if quota is None:
+        quota = WorkspaceQuota(workspace_id=workspace_id, queued_runs=0, running_runs=0)
+        db.add(quota)
+        db.flush()
+    return quota
+
+
+def reserve_queued_slot(db: Session, quota: WorkspaceQuota) -> bool:
+    """Count a new submission against the queued-runs quota; False if the workspace is full"""
+    limit = effective_limit(quota.max_queued_runs, DEFAULT_MAX_QUEUED_RUNS)
+    result = db.execute(
+        update(WorkspaceQuota)
+        .where(
+            WorkspaceQuota.workspace_id == quota.workspace_id,
+            WorkspaceQuota.queued_runs < limit,
+        )
+        .values(queued_runs=WorkspaceQuota.queued_runs + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def lock_quotas(db: Session, workspace_ids: Iterable[int]) -> Dict[int, WorkspaceQuota]:
+    """Lock quota rows in workspace id order (creating missing ones) for in-place updates"""
+    ids = sorted(set(workspace_ids))
+    quotas = {
+        quota.workspace_id: quota
+        for quota in db.query(WorkspaceQuota)
+        .filter(WorkspaceQuota.workspace_id.in_(ids))
+        .order_by(WorkspaceQuota.workspace_id)
+        .with_for_update()
+        .populate_existing()
+    }
+    for workspace_id in ids:
+        if workspace_id not in quotas:
+            quotas[workspace_id] = get_or_create_quota(db, workspace_id)
+    return quotas
+
+
+def start_running(quota: WorkspaceQuota) -> bool:
+    """Move one run from queued to running on a locked row; False if the workspace is at its running limit"""
+    if quota.running_runs >= effective_limit(quota.max_running_runs, DEFAULT_MAX_RUNNING_RUNS):
+        return False
+    quota.queued_runs = max(0, quota.queued_runs - 1)
+    quota.running_runs += 1
+    return True
+
+
+def release_slot(quota: WorkspaceQuota, was_running: bool) -> None:
+    """Free the slot (running, or queued if it never started) held by a run that reached a terminal state"""
+    if was_running:
+        quota.running_runs = max(0, quota.running_runs - 1)
+    else:
+        quota.queued_runs = max(0, quota.queued_runs - 1)
+
+
+def below_running_limit():
+    """Filter for queries joined to WorkspaceQuota: workspaces that can start another run"""
+    return or_(
+        WorkspaceQuota.workspace_id.is_(None),
+        WorkspaceQuota.running_runs
+        < func.coalesce(WorkspaceQuota.max_running_runs, DEFAULT_MAX_RUNNING_RUNS),
+    )
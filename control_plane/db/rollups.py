@@ -0,0 +1,173 @@
+"""
+Incremental run-statistics rollups (run_stats_hourly)
+
+The worker adds terminal runs to a `RollupDeltas` in the same transaction that
+moves them to a terminal state, bumping one row per (scope, hour, status) for the
+job and one for its workspace. Reads only touch the rows inside the requested window, so
+stats cost the same regardless of how much run history exists.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from db.models import Run, RunStatsHourly, RunStatus
+
+SCOPE_JOB = "job"
+SCOPE_WORKSPACE = "workspace"
+
+# Upper bounds (seconds) of the duration histogram buckets; one extra overflow bucket follows
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+
+def bucket_index(seconds: float) -> int:
+    return bisect_left(DURATION_BUCKETS, seconds)
+
+
+def hour_start(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _locked_row(db: Session, scope: str, scope_id: int, bucket_start: datetime, status: str):
+    return (
+        db.query(RunStatsHourly)
+        .filter(
+            RunStatsHourly.scope == scope,
+            RunStatsHourly.scope_id == scope_id,
+            RunStatsHourly.bucket_start == bucket_start,
+            RunStatsHourly.status == status,
+        )
+        .with_for_update()
+        .first()
+    )
+
+
+def _get_or_create_row(db: Session, scope: str, scope_id: int, bucket_start: datetime, status: str):
+    row = _locked_row(db, scope, scope_id, bucket_start, status)
+    if row is not None:
+        return row
+    try:
+        with db.begin_nested():
+            row = RunStatsHourly(
+                scope=scope,
+                scope_id=scope_id,
+                bucket_start=bucket_start,
+                status=status,
+                run_count=0,
+                duration_seconds_total=0.0,
+                duration_histogram=[0] * (len(DURATION_BUCKETS) + 1),
+            )
+            db.add(row)
+        return row
+    except IntegrityError:
+        # Another worker created the row first
+        return _locked_row(db, scope, scope_id, bucket_start, status)
+
+
+class RollupDeltas:
+    """Rollup increments for a batch of terminal runs, applied in key order
+
+    Rows are locked one at a time in sorted (scope, scope_id, hour, status) order,
+    so concurrent workers applying overlapping batches cannot deadlock.
+    """
+
+    def __init__(self):
+        self._deltas: Dict[Tuple[str, int, datetime, str], List[Any]] = {}
+
+    def add(self, run: Run, workspace_id: int) -> None:
+        """Count a run that just reached a terminal state for its job and workspace"""
+        completed_at = run.completed_at or datetime.utcnow()
+        duration = None
+        if run.started_at is not None:
+            duration = max(0.0, (completed_at - run.started_at).total_seconds())
+
+        bucket_start = hour_start(completed_at)
+        for scope, scope_id in ((SCOPE_JOB, run.job_id), (SCOPE_WORKSPACE, workspace_id)):
+            delta = self._deltas.setdefault(
+                (scope, scope_id, bucket_start, run.status),
+                [0, 0.0, [0] * (len(DURATION_BUCKETS) + 1)],
+            )
+            delta[0] += 1
+            if duration is not None:
+                delta[1] += duration
+                delta[2][bucket_index(duration)] += 1
+
+    def apply(self, db: Session) -> None:
+        for key in sorted(self._deltas):
+            run_count, duration_total, histogram = self._deltas[key]
+            row = _get_or_create_row(db, *key)
+            row.run_count += run_count
+            row.duration_seconds_total += duration_total
+            row.duration_histogram = [a + b for a, b in zip(row.duration_histogram, histogram)]
+        self._deltas.clear()
+
+
+def histogram_quantile(histogram: List[int], q: float) -> Optional[float]:
+    """Estimate a quantile by linear interpolation inside the matching bucket"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            if i == len(DURATION_BUCKETS):
+                return float(DURATION_BUCKETS[-1])
+            lower = DURATION_BUCKETS[i - 1] if i > 0 else 0.0
+            upper = DURATION_BUCKETS[i]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(DURATION_BUCKETS[-1])
+
+
+def fetch_rollups(db: Session, scope: str, scope_id: int, hours: int) -> Dict[str, Any]:
+    """Aggregate the last `hours` hourly rows for one job or workspace"""
+    window_end = datetime.utcnow()
+    window_start = hour_start(window_end) - timedelta(hours=hours - 1)
+    rows: Iterable[RunStatsHourly] = (
+        db.query(RunStatsHourly)
+        .filter(
+            RunStatsHourly.scope == scope,
+            RunStatsHourly.scope_id == scope_id,
+            RunStatsHourly.bucket_start >= window_start,
+        )
+        .order_by(RunStatsHourly.bucket_start)
+        .all()
+    )
+
+    counts: Dict[str, int] = {}
+    hourly: Dict[datetime, Dict[str, int]] = {}
+    histogram = [0] * (len(DURATION_BUCKETS) + 1)
+    duration_total = 0.0
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + row.run_count
+        hourly.setdefault(row.bucket_start, {})[row.status] = row.run_count
+        duration_total += row.duration_seconds_total
+        for i, count in enumerate(row.duration_histogram):
+            histogram[i] += count
+
+    total = sum(counts.values())
+    timed = sum(histogram)
+    return {
+        "scope": scope,
+        "scope_id": scope_id,
+        "window_start": window_start,
+        "window_end": window_end,
+        "total_runs": total,
+        "counts_by_status": counts,
+        "success_rate": (counts.get(RunStatus.SUCCEEDED.value, 0) / total) if total else None,
+        "duration": {
+            "mean_seconds": (duration_total / timed) if timed else None,
+            "p50_seconds": histogram_quantile(histogram, 0.50),
+            "p95_seconds": histogram_quantile(histogram, 0.95),
+            "p99_seconds": histogram_quantile(histogram, 0.99),
+            "bucket_bounds_seconds": list(DURATION_BUCKETS),
+            "histogram": histogram,
+        },
+        "hourly": [
+            {"bucket_start": bucket_start, "counts_by_status": status_counts}
+            for bucket_start, status_counts in hourly.items()
+        ],
+    }
@@ -0,0 +1,70 @@
+"""
+Embedded mode: API and worker in one process on SQLite
+
+Intended for CI, demos and edge nodes where running Postgres plus separate API
+and worker processes is too heavy. The API and `worker_loop()` share one event
+loop and one SQLite database (WAL mode); run submissions wake the worker
+in-process instead of waiting for the next poll.
+
+Cold start does not meet the one-second target: importing FastAPI and the
+SQLAlchemy ORM alone takes about a second on small hosts, before any of this
+package runs. `python -m bench.cold_start` measures start-to-healthy time.
+
+Run from the control_plane directory:
+
+    python -m embedded --port 8000
+    python -m embedded --database-url sqlite:////var/lib/sadeem/platform.db
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+# Add this directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+async def serve(host: str, port: int) -> None:
+    # Deferred so configuration is in place before the API module initializes the database
+    import uvicorn
+
+    from api import main as api_main
+    from db import models
+    from worker.worker import worker_loop
+
+    stop_event = asyncio.Event()
+    wakeup = asyncio.Event()
+    api_main.on_run_submitted = lambda run_id: wakeup.set()
+
+    worker = asyncio.create_task(
+        worker_loop(stop_event=stop_event, wakeup=wakeup, db_session_factory=models.SessionLocal)
+    )
+    server = uvicorn.Server(uvicorn.Config(api_main.app, host=host, port=port, log_level="info"))
+    try:
+        await server.serve()
+    finally:
+        # Drain in-flight runs before exiting, like a standalone worker on SIGTERM
+        stop_event.set()
+        await worker
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the control plane API and worker in one process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--database-url",
+        help="SQLite URL (default: $DATABASE_URL, else sqlite:///./sadeem_embedded.db)",
+    )
+    args = parser.parse_args()
+
+    os.environ["SADEEM_EMBEDDED"] = "1"
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Shared fixtures: the API on a fresh embedded (SQLite) database per test
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'api.db'}"
+    monkeypatch.setenv("SADEEM_EMBEDDED", "1")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    from api import main as api_main
+    from db import models
+
+    # api.main initializes the database on first import only
+    models.init_db(database_url)
+    with TestClient(api_main.app) as test_client:
+        yield test_client
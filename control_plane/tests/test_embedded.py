@@ -0,0 +1,80 @@
+"""
+Embedded mode regression: API writes while the worker commits transitions
+
+In embedded mode the API handlers, the worker's poll and the transition
+batcher's grouped commits all write the one SQLite database from the event loop
+thread, so their transactions never overlap. When grouped commits ran on an
+executor thread instead, submitting runs while other runs executed failed with
+`database is locked` in the API and left runs unstarted.
+
+Run from the control_plane directory:
+
+    python -m pytest tests
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+RUNS = 15
+
+
+def test_submit_while_runs_execute(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'embedded.db'}"
+    monkeypatch.setenv("SADEEM_EMBEDDED", "1")
+    monkeypatch.setenv("DATABASE_URL", database_url)
+
+    from api import main as api_main
+    from db import models
+    import worker.worker as worker
+
+    # api.main initializes the database on first import only
+    models.init_db(database_url)
+
+    monkeypatch.setattr(worker, "TRINO_SIMULATED_SECONDS", 0.05)
+    monkeypatch.setattr(worker, "POLL_INTERVAL", 0.2)
+
+    async def scenario():
+        stop_event = asyncio.Event()
+        wakeup = asyncio.Event()
+        monkeypatch.setattr(api_main, "on_run_submitted", lambda run_id: wakeup.set())
+        worker_task = asyncio.create_task(
+            worker.worker_loop(stop_event=stop_event, wakeup=wakeup, db_session_factory=models.SessionLocal)
+        )
+        transport = httpx.ASGITransport(app=api_main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://embedded") as client:
+                workspace = (await client.post("/workspaces", json={"name": "embedded"})).json()
+                job = (await client.post("/jobs", json={
+                    "workspace_id": workspace["id"],
+                    "name": "job",
+                    "job_type": "trino_sql",
+                    "definition": {"sql": "SELECT 1"},
+                })).json()
+
+                statuses = []
+                for _ in range(RUNS):
+                    response = await client.post(f"/jobs/{job['id']}/runs", json={"job_id": job["id"]})
+                    statuses.append(response.status_code)
+                    await asyncio.sleep(0.02)
+
+                for _ in range(100):
+                    runs = (await client.get("/runs")).json()
+                    if all(run["status"] == "succeeded" for run in runs):
+                        break
+                    await asyncio.sleep(0.1)
+                quota = (await client.get(f"/workspaces/{workspace['id']}/quota")).json()
+        finally:
+            stop_event.set()
+            await worker_task
+        return statuses, runs, quota
+
+    statuses, runs, quota = asyncio.run(scenario())
+
+    assert statuses == [201] * RUNS
+    assert [run["status"] for run in runs] == ["succeeded"] * RUNS
+    assert (quota["queued_runs"], quota["running_runs"]) == (0, 0)
@@ -0,0 +1,44 @@
+"""
+Job updates: partial updates and the versions they create
+
+Run from the control_plane directory:
+
+    python -m pytest tests
+"""
+import pytest
+
+
+@pytest.fixture
+def job(client):
+    workspace = client.post("/workspaces", json={"name": "jobs"}).json()
+    return client.post("/jobs", json={
+        "workspace_id": workspace["id"],
+        "name": "job",
+        "job_type": "trino_sql",
+        "definition": {"sql": "SELECT 1"},
+    }).json()
+
+
+@pytest.mark.parametrize("field", ["name", "definition", "is_active"])
+def test_update_rejects_null_for_required_fields(client, job, field):
+    response = client.put(f"/jobs/{job['id']}", json={field: None})
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == f"{field} cannot be null"
+    assert client.get(f"/jobs/{job['id']}").json() == job
+
+
+def test_update_allows_null_description(client, job):
+    client.put(f"/jobs/{job['id']}", json={"description": "nightly"})
+    response = client.put(f"/jobs/{job['id']}", json={"description": None})
+
+    assert response.status_code == 200
+    assert response.json()["description"] is None
+
+
+def test_update_definition_creates_version(client, job):
+    response = client.put(f"/jobs/{job['id']}", json={"definition": {"sql": "SELECT 2"}})
+
+    assert response.status_code == 200
+    versions = client.get(f"/jobs/{job['id']}/versions").json()
+    assert [version["version"] for version in versions] == [1, 2]
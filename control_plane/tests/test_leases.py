@@ -0,0 +1,77 @@
+"""
+Worker leases: runs left running by a dead worker are failed and release their quota slot
+
+Run from the control_plane directory:
+
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from db import models  # noqa: E402
+from db.models import Job, Run, RunTransitionOutbox, Workspace, WorkerHeartbeat, WorkspaceQuota  # noqa: E402
+from worker import leases  # noqa: E402
+from worker.worker import claim_queued_runs  # noqa: E402
+
+
+def _setup(tmp_path, runs=2):
+    session_factory = models.init_db(f"sqlite:///{tmp_path / 'leases.db'}")
+    db = session_factory()
+    workspace = Workspace(name="leases", quota=WorkspaceQuota(queued_runs=runs, running_runs=0))
+    db.add(workspace)
+    db.flush()
+    job = Job(workspace_id=workspace.id, name="job", job_type="trino_sql", definition={"sql": "SELECT 1"})
+    db.add(job)
+    db.flush()
+    db.add_all([Run(job_id=job.id) for _ in range(runs)])
+    workspace_id = workspace.id
+    db.commit()
+    db.close()
+    return session_factory, workspace_id
+
+
+def _state(session_factory, workspace_id):
+    db = session_factory()
+    try:
+        quota = db.get(WorkspaceQuota, workspace_id)
+        statuses = [run.status for run in db.query(Run).order_by(Run.id)]
+        return statuses, (quota.queued_runs, quota.running_runs), db.query(RunTransitionOutbox).count()
+    finally:
+        db.close()
+
+
+def test_reclaim_runs_of_exited_worker(tmp_path):
+    session_factory, workspace_id = _setup(tmp_path)
+    leases.renew_lease(session_factory, "host:worker-0:dead")
+    claimed = claim_queued_runs(session_factory, 10, "host:worker-0:dead")
+    assert len(claimed) == 2
+
+    # Another live worker's runs are left alone
+    assert leases.reclaim_runs(session_factory, claimed_by="host:worker-1:alive") == []
+    reclaimed = leases.reclaim_runs(session_factory, claimed_by="host:worker-0:dead")
+
+    assert reclaimed == [run.id for run in claimed]
+    statuses, counters, outbox_rows = _state(session_factory, workspace_id)
+    assert statuses == ["failed", "failed"]
+    assert counters == (0, 0)
+    assert outbox_rows == 4  # queued -> running, running -> failed per run
+    db = session_factory()
+    assert db.query(WorkerHeartbeat).count() == 0
+    db.close()
+
+
+def test_reclaim_runs_after_lease_expires(tmp_path, monkeypatch):
+    session_factory, workspace_id = _setup(tmp_path)
+    leases.renew_lease(session_factory, "host:worker-0:killed")
+    claim_queued_runs(session_factory, 10, "host:worker-0:killed")
+
+    # Lease still fresh
+    assert leases.reclaim_runs(session_factory) == []
+    assert _state(session_factory, workspace_id)[:2] == (["running", "running"], (0, 2))
+
+    monkeypatch.setattr(leases, "WORKER_LEASE_TIMEOUT", -1.0)
+    assert len(leases.reclaim_runs(session_factory)) == 2
+    assert _state(session_factory, workspace_id)[:2] == (["failed", "failed"], (0, 0))
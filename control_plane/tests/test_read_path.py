@@ -0,0 +1,84 @@
+"""
+List endpoint fast path: projections, conditional GET and the ETag validator
+
+Run from the control_plane directory:
+
+    python -m pytest tests
+"""
+from datetime import datetime
+
+import pytest
+
+from db import models
+from db.models import Job, Run
+
+
+@pytest.fixture
+def job(client):
+    workspace = client.post("/workspaces", json={"name": "reads"}).json()
+    job = client.post("/jobs", json={
+        "workspace_id": workspace["id"],
+        "name": "job",
+        "job_type": "trino_sql",
+        "definition": {"sql": "SELECT 1"},
+    }).json()
+    for _ in range(3):
+        assert client.post(f"/jobs/{job['id']}/runs", json={"job_id": job["id"]}).status_code == 201
+    return job
+
+
+def test_fields_projection(client, job):
+    runs = client.get("/runs", params={"fields": "id,status"}).json()
+
+    assert runs == [{"id": run_id, "status": "queued"} for run_id in (1, 2, 3)]
+
+
+def test_unknown_field_is_rejected(client, job):
+    response = client.get("/runs", params={"fields": "id,secret"})
+
+    assert response.status_code == 400
+    assert "Unknown fields: secret" in response.json()["detail"]
+
+
+def test_conditional_get_returns_304_until_a_row_changes(client, job):
+    first = client.get("/runs")
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/runs", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    # A different projection or page is a different representation
+    assert client.get("/runs", params={"fields": "id"}, headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/runs", params={"limit": 2}, headers={"If-None-Match": etag}).status_code == 200
+
+    # Writes to another table leave the page valid
+    client.put(f"/jobs/{job['id']}", json={"description": "changed"})
+    assert client.get("/runs", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_etag_changes_when_a_write_stamps_an_older_updated_at(client, job):
+    """A writer whose clock is behind must still invalidate the page"""
+    etag = client.get("/runs").headers["etag"]
+
+    db = models.SessionLocal()
+    run = db.get(Run, 2)
+    run.status = "running"
+    run.updated_at = datetime(2000, 1, 1)
+    db.commit()
+    db.close()
+
+    response = client.get("/runs", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [run["status"] for run in response.json()] == ["queued", "running", "queued"]
+
+
+def test_job_etag_changes_on_update(client, job):
+    etag = client.get("/jobs").headers["etag"]
+    client.put(f"/jobs/{job['id']}", json={"definition": {"sql": "SELECT 2"}})
+
+    db = models.SessionLocal()
+    assert db.get(Job, job["id"]).row_version > 1
+    db.close()
+    assert client.get("/jobs", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,116 @@
+"""
+Worker leases: reclaim runs whose worker process died
+
+The poll records the claiming process on each run (`runs.claimed_by`), and every
+worker process renews a row in `worker_heartbeats` while it runs. A run left
+`running` by a process that is gone would otherwise hold its workspace's
+`running_runs` slot forever, so such runs are failed through `apply_transitions`
+(quota slot released, rollups and outbox row written like any other transition):
+
+- by the supervisor, as soon as it sees a child exit or has to kill it
+- by any worker, at startup and on every renewal, once the claiming process's
+  heartbeat is older than WORKER_LEASE_TIMEOUT (covers pods killed outright)
+
+Heartbeats use the worker's clock; hosts must agree to well within the timeout.
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, or_
+
+from db.models import Job, Run, RunStatus, WorkerHeartbeat
+from worker.transitions import Transition, apply_transitions
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a heartbeat after which a worker's running runs are reclaimed
+WORKER_LEASE_TIMEOUT = float(os.getenv("WORKER_LEASE_TIMEOUT", "60"))
+# Heartbeats per lease timeout, so a few missed renewals do not expire a live worker
+LEASE_RENEWALS_PER_TIMEOUT = 4
+
+
+def new_worker_id(name: Optional[str] = None) -> str:
+    """Identity recorded in runs.claimed_by; unique per process start, even if a pid is reused"""
+    return f"{socket.gethostname()}:{name or os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def renew_lease(db_session_factory, worker_id: str) -> None:
+    """Record that `worker_id` is alive"""
+    db = db_session_factory()
+    try:
+        now = datetime.utcnow()
+        heartbeat = db.get(WorkerHeartbeat, worker_id)
+        if heartbeat is None:
+            db.add(WorkerHeartbeat(worker_id=worker_id, started_at=now, heartbeat_at=now))
+        else:
+            heartbeat.heartbeat_at = now
+        db.commit()
+    finally:
+        db.close()
+
+
+def release_lease(db_session_factory, worker_id: str) -> None:
+    """Drop the heartbeat of a worker that drained and exited cleanly"""
+    db = db_session_factory()
+    try:
+        db.query(WorkerHeartbeat).filter(WorkerHeartbeat.worker_id == worker_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def reclaim_runs(db_session_factory, claimed_by: Optional[str] = None) -> List[int]:
+    """Fail runs left `running` by dead workers and return their ids
+
+    With `claimed_by`, the caller knows that worker is dead (the supervisor after
+    a child exited) and all its running runs are reclaimed. Otherwise runs are
+    reclaimed whose worker's heartbeat expired, or, for runs with no heartbeat
+    row (claimed before leases existed, or the row was already removed), that
+    started more than WORKER_LEASE_TIMEOUT ago.
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=WORKER_LEASE_TIMEOUT)
+    db = db_session_factory()
+    try:
+        query = (
+            db.query(Run.id, Run.claimed_by, Job.workspace_id)
+            .join(Job, Job.id == Run.job_id)
+            .filter(Run.status == RunStatus.RUNNING.value)
+        )
+        if claimed_by is not None:
+            query = query.filter(Run.claimed_by == claimed_by)
+        else:
+            query = (
+                query.outerjoin(WorkerHeartbeat, WorkerHeartbeat.worker_id == Run.claimed_by)
+                .filter(or_(
+                    WorkerHeartbeat.heartbeat_at < cutoff,
+                    and_(WorkerHeartbeat.worker_id.is_(None), Run.started_at < cutoff),
+                ))
+            )
+        # Skip runs another reclaimer (or the owner's final commit) holds; they are handled there
+        orphans = query.order_by(Run.id).with_for_update(of=Run, skip_locked=True).all()
+
+        outcomes = apply_transitions(db, [
+            Transition(run_id, workspace_id, RunStatus.FAILED.value, {
+                "completed_at": now,
+                "error_message": f"Worker {owner or '(unknown)'} exited before the run finished",
+            })
+            for run_id, owner, workspace_id in orphans
+        ]) if orphans else []
+
+        if claimed_by is not None:
+            db.query(WorkerHeartbeat).filter(WorkerHeartbeat.worker_id == claimed_by).delete()
+        else:
+            db.query(WorkerHeartbeat).filter(WorkerHeartbeat.heartbeat_at < cutoff).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    reclaimed = [run_id for (run_id, _, _), outcome in zip(orphans, outcomes) if outcome is True]
+    if reclaimed:
+        logger.warning(f"Reclaimed {len(reclaimed)} runs left running by dead workers: {reclaimed}")
+    return reclaimed
@@ -0,0 +1,273 @@
+"""
+Worker supervisor: runs N worker processes with a shared configuration
+
+- Starts WORKER_PROCESSES children, each running `worker_loop()`
+- Restarts children that exit unexpectedly (with exponential backoff)
+- On SIGTERM/SIGINT forwards SIGTERM so children drain their in-flight runs,
+  then kills any child still running after WORKER_DRAIN_TIMEOUT
+- Fails the runs a child left `running` when it exits or is killed, releasing
+  their quota slots (see worker/leases.py)
+- Serves Prometheus metrics (queue depth, desired replicas hint) so a
+  Kubernetes HPA can scale workers on backlog instead of CPU
+
+Run from the control_plane directory:
+
+    python -m worker.supervisor
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from db.models import WorkspaceQuota, get_database_url
+from worker.leases import new_worker_id, reclaim_runs
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", str(os.cpu_count() or 1)))
+WORKER_DRAIN_TIMEOUT = float(os.getenv("WORKER_DRAIN_TIMEOUT", "300"))
+SUPERVISOR_METRICS_PORT = int(os.getenv("SUPERVISOR_METRICS_PORT", "9108"))
+SUPERVISOR_METRICS_INTERVAL = float(os.getenv("SUPERVISOR_METRICS_INTERVAL", "15"))
+# Queued runs one worker process is expected to absorb; drives the desired replicas hint
+WORKER_TARGET_BACKLOG = int(os.getenv("WORKER_TARGET_BACKLOG", "5"))
+
+# Restart backoff for crashing children (seconds); reset once a child stays up
+RESTART_BACKOFF_INITIAL = 1.0
+RESTART_BACKOFF_MAX = 60.0
+RESTART_BACKOFF_RESET_AFTER = 60.0
+
+
+def _run_worker(database_url: str, worker_id: str) -> None:
+    """Child process entrypoint"""
+    from worker.worker import worker_loop
+
+    asyncio.run(worker_loop(database_url, worker_id=worker_id))
+
+
+class QueueMetrics:
+    """Backlog gauges refreshed from the workspace_quotas counters"""
+
+    def __init__(self, database_url: str):
+        self.engine = create_engine(database_url, poolclass=NullPool)
+        self.queued = 0
+        self.running = 0
+        self.last_refresh: Optional[float] = None
+
+    def refresh(self) -> None:
+        try:
+            with self.engine.connect() as conn:
+                queued, running = conn.execute(
+                    select(
+                        func.coalesce(func.sum(WorkspaceQuota.queued_runs), 0),
+                        func.coalesce(func.sum(WorkspaceQuota.running_runs), 0),
+                    )
+                ).one()
+        except Exception as e:
+            logger.error(f"Failed to refresh queue metrics: {e}")
+            return
+        self.queued, self.running = int(queued), int(running)
+        self.last_refresh = time.time()
+
+
+class WorkerSupervisor:
+    """Keeps `processes` worker children alive and drains them on shutdown"""
+
+    def __init__(self, database_url: str, processes: int):
+        self.database_url = database_url
+        self.processes = processes
+        self.context = multiprocessing.get_context("spawn")
+        self.children: List[Optional[multiprocessing.Process]] = [None] * processes
+        self.worker_ids: Dict[int, str] = {}
+        self.started_at: Dict[int, float] = {}
+        self.backoff: Dict[int, float] = {}
+        self.next_start: Dict[int, float] = {}
+        self.restarts = 0
+        self.stopping = False
+        self.metrics = QueueMetrics(database_url)
+        self.sessions = sessionmaker(bind=self.metrics.engine)
+
+    def alive(self) -> int:
+        return sum(1 for child in self.children if child is not None and child.is_alive())
+
+    def desired_replicas(self) -> int:
+        """Worker pods needed to keep the backlog at WORKER_TARGET_BACKLOG per process"""
+        per_pod = max(1, self.processes * WORKER_TARGET_BACKLOG)
+        return max(1, math.ceil(self.metrics.queued / per_pod))
+
+    def _start(self, slot: int) -> None:
+        # Assigned here (not by the child) so runs of a child that dies early can still be reclaimed
+        worker_id = new_worker_id(f"worker-{slot}")
+        child = self.context.Process(
+            target=_run_worker, args=(self.database_url, worker_id), name=f"worker-{slot}", daemon=False
+        )
+        child.start()
+        self.children[slot] = child
+        self.worker_ids[slot] = worker_id
+        self.started_at[slot] = time.monotonic()
+        logger.info(f"Started worker-{slot} (pid {child.pid}, id {worker_id})")
+
+    def _reclaim(self, slot: int) -> None:
+        """Fail the runs the exited child in `slot` left running"""
+        worker_id = self.worker_ids.pop(slot, None)
+        if worker_id is None:
+            return
+        try:
+            reclaimed = reclaim_runs(self.sessions, claimed_by=worker_id)
+        except Exception as e:
+            # Workers reclaim them once the child's lease expires
+            logger.error(f"Failed to reclaim runs of worker-{slot} ({worker_id}): {e}")
+            return
+        if reclaimed:
+            logger.warning(f"worker-{slot} left {len(reclaimed)} runs running; marked them failed")
+
+    def _check_children(self) -> None:
+        now = time.monotonic()
+        for slot, child in enumerate(self.children):
+            if child is not None and child.is_alive():
+                continue
+            if child is not None:
+                uptime = now - self.started_at.get(slot, now)
+                logger.warning(f"worker-{slot} (pid {child.pid}) exited with code {child.exitcode}")
+                child.close()
+                self._reclaim(slot)
+                self.children[slot] = None
+                if uptime >= RESTART_BACKOFF_RESET_AFTER:
+                    self.backoff[slot] = RESTART_BACKOFF_INITIAL
+                else:
+                    self.backoff[slot] = min(
+                        RESTART_BACKOFF_MAX, self.backoff.get(slot, RESTART_BACKOFF_INITIAL / 2) * 2
+                    )
+                self.next_start[slot] = now + self.backoff[slot]
+                self.restarts += 1
+            if now >= self.next_start.get(slot, 0):
+                self._start(slot)
+
+    def request_stop(self, signum=None, frame=None) -> None:
+        if not self.stopping:
+            logger.info("Shutdown requested, draining workers")
+        self.stopping = True
+
+    def drain(self) -> None:
+        """SIGTERM every child, wait up to WORKER_DRAIN_TIMEOUT, then SIGKILL stragglers
+
+        Runs a killed child had not finished are reclaimed before returning.
+        """
+        children = [
+            (slot, child) for slot, child in enumerate(self.children)
+            if child is not None and child.is_alive()
+        ]
+        for _, child in children:
+            os.kill(child.pid, signal.SIGTERM)
+        deadline = time.monotonic() + WORKER_DRAIN_TIMEOUT
+        for slot, child in children:
+            child.join(max(0.0, deadline - time.monotonic()))
+            if child.is_alive():
+                logger.warning(f"{child.name} did not drain in time, killing")
+                child.kill()
+                child.join()
+            self._reclaim(slot)
+        logger.info("All workers stopped")
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+
+        next_refresh = 0.0
+        while not self.stopping:
+            self._check_children()
+            if time.monotonic() >= next_refresh:
+                self.metrics.refresh()
+                next_refresh = time.monotonic() + SUPERVISOR_METRICS_INTERVAL
+            time.sleep(0.5)
+        self.drain()
+        self.metrics.engine.dispose()
+
+    def render_metrics(self) -> str:
+        lines = [
+            "# HELP sadeem_runs_queued Runs waiting to start (all workspaces)",
+            "# TYPE sadeem_runs_queued gauge",
+            f"sadeem_runs_queued {self.metrics.queued}",
+            "# HELP sadeem_runs_running Runs currently executing (all workspaces)",
+            "# TYPE sadeem_runs_running gauge",
+            f"sadeem_runs_running {self.metrics.running}",
+            "# HELP sadeem_worker_processes Live worker processes in this supervisor",
+            "# TYPE sadeem_worker_processes gauge",
+            f"sadeem_worker_processes {self.alive()}",
+            "# HELP sadeem_worker_restarts_total Worker processes restarted after exiting",
+            "# TYPE sadeem_worker_restarts_total counter",
+            f"sadeem_worker_restarts_total {self.restarts}",
+            "# HELP sadeem_worker_desired_replicas Worker pods needed for the current backlog",
+            "# TYPE sadeem_worker_desired_replicas gauge",
+            f"sadeem_worker_desired_replicas {self.desired_replicas()}",
+            "# HELP sadeem_worker_draining 1 while the supervisor is shutting down",
+            "# TYPE sadeem_worker_draining gauge",
+            f"sadeem_worker_draining {int(self.stopping)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(supervisor: WorkerSupervisor, port: int) -> ThreadingHTTPServer:
+    """Expose /metrics (Prometheus text format) and /healthz on a background thread"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = supervisor.render_metrics().encode()
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/healthz":
+                healthy = supervisor.alive() > 0 or supervisor.stopping
+                self.send_response(200 if healthy else 503)
+                self.end_headers()
+                return
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    database_url = get_database_url()
+    supervisor = WorkerSupervisor(database_url, WORKER_PROCESSES)
+    server = serve_metrics(supervisor, SUPERVISOR_METRICS_PORT)
+    logger.info(
+        f"Supervising {WORKER_PROCESSES} worker processes, metrics on :{SUPERVISOR_METRICS_PORT}/metrics"
+    )
+    try:
+        supervisor.run()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Grouped commits for run state transitions
+
+Executors do not commit run status changes themselves. The worker's poll claims
+runs (queued -> running) in one transaction through `apply_transitions`, and
+executors submit their terminal transitions to a TransitionBatcher, which applies everything pending from all concurrent
+runs in one transaction (group commit): lock the affected runs, validate each
+transition against ALLOWED_TRANSITIONS, update the run, adjust the workspace
+quota counters, fold terminal runs into the hourly rollups and add the outbox
+record. One commit covers the whole batch.
+
+Rows are locked table by table in a fixed order (runs by id, quota rows by
+workspace id, rollup rows by key), never in batch-arrival order, so grouped
+commits from several worker processes cannot deadlock on each other.
+
+On Postgres the commit runs on an executor thread and batches form while the
+previous flush is in flight. SQLite has a single writer and a deferred
+transaction that reads then writes fails outright (busy_timeout does not apply)
+if another connection wrote in between, so there grouped commits run inline on
+the event loop thread, serialized with the API in embedded mode.
+TRANSITION_FLUSH_INTERVAL adds an optional linger to trade latency for larger batches.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy.orm import Session
+
+from db.models import Run, RunStatus
+from db.outbox import record_transition
+from db.quotas import lock_quotas, release_slot, start_running
+from db.rollups import RollupDeltas
+
+logger = logging.getLogger(__name__)
+
+# Most transitions applied per commit
+TRANSITION_BATCH_SIZE = int(os.getenv("TRANSITION_BATCH_SIZE", "100"))
+# Extra time (seconds) to wait for more transitions before flushing; 0 flushes as soon as possible
+TRANSITION_FLUSH_INTERVAL = float(os.getenv("TRANSITION_FLUSH_INTERVAL", "0"))
+
+ALLOWED_TRANSITIONS = {
+    RunStatus.QUEUED.value: {RunStatus.RUNNING.value, RunStatus.FAILED.value, RunStatus.CANCELLED.value},
+    RunStatus.RUNNING.value: {RunStatus.SUCCEEDED.value, RunStatus.FAILED.value, RunStatus.CANCELLED.value},
+}
+
+TERMINAL_STATUSES = {RunStatus.SUCCEEDED.value, RunStatus.FAILED.value, RunStatus.CANCELLED.value}
+
+
+class InvalidTransition(Exception):
+    """The run is missing or its current status does not allow the requested transition"""
+
+
+@dataclass
+class Transition:
+    run_id: int
+    workspace_id: int
+    to_status: str
+    fields: Dict[str, Any]
+    future: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+# Outcome of one transition within a flush: applied, refused by quota, or rejected
+Outcome = Union[bool, InvalidTransition]
+
+
+class TransitionBatcher:
+    """Coalesces run state transitions from concurrent executors into grouped commits"""
+
+    def __init__(
+        self,
+        db_session_factory,
+        batch_size: int = TRANSITION_BATCH_SIZE,
+        flush_interval: float = TRANSITION_FLUSH_INTERVAL,
+    ):
+        self.db_session_factory = db_session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "asyncio.Queue[Optional[Transition]]" = asyncio.Queue()
+        probe = db_session_factory()
+        try:
+            self.inline = probe.get_bind().dialect.name == "sqlite"
+        finally:
+            probe.close()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything already submitted, then stop"""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+
+    async def transition(self, run_id: int, workspace_id: int, to_status: str, **fields: Any) -> bool:
+        """Apply a transition in the next grouped commit and wait for it
+
+        Returns False when a start (-> running) is refused because the workspace is
+        at its running runs quota; the run stays queued. Raises InvalidTransition
+        when the run's current status does not allow `to_status`.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(Transition(run_id, workspace_id, to_status, fields, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    if self._queue.empty() and loop.time() < deadline:
+                        item = await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Transition]) -> None:
+        # Blocking DB work runs off the event loop (except on SQLite); transitions keep queueing meanwhile
+        try:
+            if self.inline:
+                outcomes = self._commit(batch)
+            else:
+                outcomes = await asyncio.get_running_loop().run_in_executor(None, self._commit, batch)
+        except Exception as e:
+            for transition in batch:
+                if not transition.future.done():
+                    transition.future.set_exception(e)
+            return
+        for transition, outcome in zip(batch, outcomes):
+            if transition.future.done():
+                continue
+            if isinstance(outcome, Exception):
+                transition.future.set_exception(outcome)
+            else:
+                transition.future.set_result(outcome)
+
+    def _commit(self, batch: List[Transition]) -> List[Union[Outcome, Exception]]:
+        try:
+            return self._commit_group(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                return [e]
+            # Retry one by one so a single bad transition does not fail the others
+            logger.warning(f"Grouped commit of {len(batch)} transitions failed ({e}); retrying individually")
+            outcomes: List[Union[Outcome, Exception]] = []
+            for transition in batch:
+                try:
+                    outcomes.extend(self._commit_group([transition]))
+                except Exception as single_error:
+                    outcomes.append(single_error)
+            return outcomes
+
+    def _commit_group(self, batch: List[Transition]) -> List[Outcome]:
+        db = self.db_session_factory()
+        try:
+            outcomes = apply_transitions(db, batch)
+            db.commit()
+            return outcomes
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def apply_transitions(db: Session, batch: List[Transition]) -> List[Outcome]:
+    """Apply transitions in the caller's transaction, one outcome per transition
+
+    Used by the batcher for grouped commits and by the worker's poll to claim runs.
+    """
+    run_ids = sorted({transition.run_id for transition in batch})
+    runs = {
+        run.id: run
+        for run in db.query(Run).filter(Run.id.in_(run_ids)).order_by(Run.id).with_for_update()
+    }
+    quotas = lock_quotas(db, (transition.workspace_id for transition in batch))
+    rollups = RollupDeltas()
+
+    outcomes: List[Outcome] = []
+    for transition in batch:
+        run = runs.get(transition.run_id)
+        if run is None:
+            outcomes.append(InvalidTransition(f"Run {transition.run_id} not found"))
+            continue
+        from_status = run.status
+        if transition.to_status not in ALLOWED_TRANSITIONS.get(from_status, ()):
+            outcomes.append(
+                InvalidTransition(f"Run {run.id} cannot move from {from_status} to {transition.to_status}")
+            )
+            continue
+
+        quota = quotas[transition.workspace_id]
+        if transition.to_status == RunStatus.RUNNING.value:
+            if not start_running(quota):
+                outcomes.append(False)
+                continue
+        else:
+            release_slot(quota, was_running=from_status == RunStatus.RUNNING.value)
+
+        run.status = transition.to_status
+        for name, value in transition.fields.items():
+            setattr(run, name, value)
+        if run.status in TERMINAL_STATUSES:
+            rollups.add(run, transition.workspace_id)
+        record_transition(db, run, transition.workspace_id, from_status, transition.fields)
+        outcomes.append(True)
+
+    rollups.apply(db)
+    return outcomes